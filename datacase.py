@@ -30,6 +30,11 @@ BAIRRO_COORDS: Dict[str, Tuple[float, float]] = {
     "Vale do Grande Rio": (-9.4800, -40.5300),
 }
 
+_LAT = {bairro: coords[0] for bairro, coords in BAIRRO_COORDS.items()}
+_LON = {bairro: coords[1] for bairro, coords in BAIRRO_COORDS.items()}
+_BAIRRO_CATS = pd.CategoricalDtype(sorted(BAIRRO_COORDS))
+_COORDS = np.array([BAIRRO_COORDS[b] for b in _BAIRRO_CATS.categories], dtype=np.float64)
+
 PRIMARY_COLOR = "#0E6251"
 SECONDARY_COLOR = "#1ABC9C"
 ACCENT_COLOR = "#0B5345"
@@ -101,29 +106,29 @@ def render_hero(
 
 
 def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
     df.columns = [col.replace("\n", " ").strip() for col in df.columns]
     return df
 
 
 def _coerce_numeric(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
-    df = df.copy()
-    for column in columns:
-        if column in df.columns:
-            df[column] = pd.to_numeric(df[column], errors="coerce")
-    return df
+    updates = {
+        column: pd.to_numeric(df[column], errors="coerce")
+        for column in columns
+        if column in df.columns
+    }
+    return df.assign(**updates)
 
 
 def _prepare_coordinates(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["Lat"] = df["Bairro"].map(lambda bairro: BAIRRO_COORDS.get(bairro, (np.nan, np.nan))[0])
-    df["Lon"] = df["Bairro"].map(lambda bairro: BAIRRO_COORDS.get(bairro, (np.nan, np.nan))[1])
-    return df
+    codes = df["Bairro"].astype(_BAIRRO_CATS).cat.codes.to_numpy()
+    latlon = _COORDS[np.where(codes >= 0, codes, 0)]
+    latlon[codes < 0] = np.nan
+    return df.assign(Lat=latlon[:, 0], Lon=latlon[:, 1])
 
 
 def generate_synthetic_data(num_clients: int = 150) -> pd.DataFrame:
     rng = np.random.default_rng(42)
-    clientes = [f"{i:03d}" for i in range(1, num_clients + 1)]
+    clientes = pd.Series(np.arange(1, num_clients + 1)).astype(str).str.zfill(3)
     planos = np.array([50, 100, 150, 200, 500])
     tipos_plano = np.array(["Residencial", "Empresarial", "Premium"])
     bairros = sorted(BAIRRO_COORDS.keys())
@@ -140,10 +145,17 @@ def generate_synthetic_data(num_clients: int = 150) -> pd.DataFrame:
     return df
 
 
+def _read_csv(csv_path: Path) -> pd.DataFrame:
+    try:
+        return pd.read_csv(csv_path, engine="pyarrow")
+    except ImportError:
+        return pd.read_csv(csv_path)
+
+
 @st.cache_data(show_spinner=False)
-def load_client_data(csv_path: Path) -> Tuple[pd.DataFrame, str]:
+def load_client_data(csv_path: Path) -> Tuple[pd.DataFrame, str, list[str], list[str]]:
     try:
-        df = pd.read_csv(csv_path)
+        df = _read_csv(csv_path)
         df = _clean_columns(df)
         df["Bairro"] = df.get("Bairro", "").astype(str).str.strip()
         df["ClienteID"] = df.get("ClienteID", "").astype(str).str.zfill(3)
@@ -159,16 +171,24 @@ def load_client_data(csv_path: Path) -> Tuple[pd.DataFrame, str]:
     df = df.dropna(subset=["Plano (MB/s)", "Consumo Atual (MB/s)", "Tipo de Plano", "Bairro"]).copy()
     df["Bairro"] = df["Bairro"].astype(str).str.strip()
     df["ClienteID"] = df["ClienteID"].astype(str).str.zfill(3)
-    df["Excedeu"] = df["Consumo Atual (MB/s)"] > df["Plano (MB/s)"]
-    df["Excedeu50"] = df["Consumo Atual (MB/s)"] > df["Plano (MB/s)"] * 1.5
+    plano = df["Plano (MB/s)"].to_numpy()
+    consumo = df["Consumo Atual (MB/s)"].to_numpy()
+    df["Excedeu"] = (consumo > plano).astype(np.uint8)
+    df["Excedeu50"] = (consumo > plano * 1.5).astype(np.uint8)
+    for column in ("Bairro", "Tipo de Plano"):
+        df[column] = df[column].astype("category")
     df = _prepare_coordinates(df)
-    return df, source
+    bairros_sorted = sorted(df["Bairro"].dropna().unique())
+    tipos_sorted = sorted(df["Tipo de Plano"].dropna().unique())
+    return df, source, bairros_sorted, tipos_sorted
 
 
-def render_filters(df: pd.DataFrame) -> Tuple[list[str], list[str], str, int]:
+def render_filters(
+    df: pd.DataFrame,
+    bairros: list[str],
+    tipos: list[str],
+) -> Tuple[list[str], list[str], str, int]:
     st.subheader("Filtros de Análise")
-    bairros = sorted(df["Bairro"].dropna().unique())
-    tipos = sorted(df["Tipo de Plano"].dropna().unique())
     consumo_max = int(np.ceil(df["Consumo Atual (MB/s)"].max() / 10.0) * 10)
 
     col_f1, col_f2 = st.columns(2)
@@ -186,28 +206,36 @@ def render_filters(df: pd.DataFrame) -> Tuple[list[str], list[str], str, int]:
     return bairros_sel, tipos_sel, criticos_sel, consumo_min
 
 
+def _hash_filtered_frame(df: pd.DataFrame) -> Tuple[int, int]:
+    return len(df), int(pd.util.hash_pandas_object(df.index, index=False).sum())
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_filtered_frame})
 def apply_filters(
     df: pd.DataFrame,
-    bairros_sel: Iterable[str],
-    tipos_sel: Iterable[str],
+    bairros_sel: Tuple[str, ...],
+    tipos_sel: Tuple[str, ...],
     criticos_sel: str,
     consumo_min: int,
 ) -> pd.DataFrame:
-    mask = (
-        df["Bairro"].isin(bairros_sel)
-        & df["Tipo de Plano"].isin(tipos_sel)
-        & (df["Consumo Atual (MB/s)"] >= consumo_min)
-    )
-    df_filtrado = df.loc[mask].copy()
-
+    masks = []
+    if len(bairros_sel) < len(df["Bairro"].cat.categories):
+        masks.append(df["Bairro"].isin(bairros_sel).to_numpy())
+    if len(tipos_sel) < len(df["Tipo de Plano"].cat.categories):
+        masks.append(df["Tipo de Plano"].isin(tipos_sel).to_numpy())
+    if consumo_min > 0:
+        masks.append(df["Consumo Atual (MB/s)"].to_numpy() >= consumo_min)
     if criticos_sel == "Apenas críticos":
-        df_filtrado = df_filtrado[df_filtrado["Excedeu"]]
+        masks.append(df["Excedeu"].to_numpy() != 0)
     elif criticos_sel == "Sem críticos":
-        df_filtrado = df_filtrado[~df_filtrado["Excedeu"]]
+        masks.append(df["Excedeu"].to_numpy() == 0)
 
-    return df_filtrado
+    if not masks:
+        return df
+    return df.loc[np.logical_and.reduce(masks)]
 
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_filtered_frame})
 def compute_kpis(df: pd.DataFrame) -> Dict[str, float]:
     if df.empty:
         return {
@@ -219,11 +247,15 @@ def compute_kpis(df: pd.DataFrame) -> Dict[str, float]:
             "perc_criticos": 0.0,
         }
 
+    excedeu = df["Excedeu"].to_numpy()
+    excedeu50 = df["Excedeu50"].to_numpy()
+    consumo = df["Consumo Atual (MB/s)"].to_numpy()
+
     total_clientes = int(df.shape[0])
-    total_criticos = int(df["Excedeu"].sum())
-    total_criticos50 = int(df["Excedeu50"].sum())
-    consumo_medio = float(df["Consumo Atual (MB/s)"].mean())
-    bairro_top = df["Bairro"].mode().iloc[0]
+    total_criticos = int(excedeu.sum())
+    total_criticos50 = int(excedeu50.sum())
+    consumo_medio = float(consumo.mean())
+    bairro_top = df["Bairro"].value_counts().idxmax()
     perc_criticos = float(total_criticos / total_clientes * 100)
 
     return {
@@ -248,6 +280,7 @@ def render_kpis(kpis: Dict[str, float]) -> None:
     st.markdown("---")
 
 
+@st.fragment
 def render_charts(df_filtrado: pd.DataFrame, bairros: Iterable[str]) -> None:
     if df_filtrado.empty:
         st.info("Ajuste os filtros para visualizar os gráficos.")
@@ -284,15 +317,15 @@ def render_charts(df_filtrado: pd.DataFrame, bairros: Iterable[str]) -> None:
         top20,
         x="ClienteID",
         y="Consumo Atual (MB/s)",
-        color="Excedeu",
+        color=top20["Excedeu"].astype(bool),
         color_discrete_map={True: SECONDARY_COLOR, False: PRIMARY_COLOR},
     )
     st.plotly_chart(fig_top, use_container_width=True)
 
 
 @st.cache_data(show_spinner=False)
-def build_trend_data(seed_data: Tuple[Tuple[str, float], ...]) -> pd.DataFrame:
-    if not seed_data:
+def build_trend_data(bairros: Tuple[str, ...], bases: np.ndarray) -> pd.DataFrame:
+    if not bairros:
         return pd.DataFrame(columns=["Bairro", "Mês", "Consumo Médio (MB/s)"])
 
     rng = np.random.default_rng(2024)
@@ -301,7 +334,7 @@ def build_trend_data(seed_data: Tuple[Tuple[str, float], ...]) -> pd.DataFrame:
         "Jul", "Ago", "Set", "Out", "Nov", "Dez",
     ]
     registros = []
-    for bairro, base in seed_data:
+    for bairro, base in zip(bairros, bases):
         base = base if not np.isnan(base) else rng.uniform(60, 200)
         for idx, mes in enumerate(meses):
             tendencia = max(base + rng.normal(0, 12) + idx * 1.2, 0)
@@ -313,42 +346,99 @@ def build_trend_data(seed_data: Tuple[Tuple[str, float], ...]) -> pd.DataFrame:
     return pd.DataFrame(registros)
 
 
+TREND_MAX_POINTS = 500
+
+
+def _lttb_indices(valores: np.ndarray, n_out: int) -> np.ndarray:
+    """Seleciona índices pelo algoritmo Largest-Triangle-Three-Buckets."""
+    n = len(valores)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    y = valores.astype(np.float64)
+    limites = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    indices = np.empty(n_out, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    anterior = 0
+    for i in range(n_out - 2):
+        lo, hi = limites[i], max(limites[i + 1], limites[i] + 1)
+        if i + 2 < n_out - 1:
+            media_x = (limites[i + 1] + limites[i + 2] - 1) / 2.0
+            media_y = y[limites[i + 1]:limites[i + 2]].mean()
+        else:
+            media_x = float(n - 1)
+            media_y = y[n - 1]
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[lo:hi] - y[anterior])
+            - (x[anterior] - x[lo:hi]) * (media_y - y[anterior])
+        )
+        anterior = lo + int(areas.argmax())
+        indices[i + 1] = anterior
+    return indices
+
+
+def _downsample_trend(df_tendencia: pd.DataFrame) -> pd.DataFrame:
+    grupos = df_tendencia.groupby("Bairro", observed=True, sort=False)
+    if grupos.size().max() <= TREND_MAX_POINTS:
+        return df_tendencia
+    partes = [
+        grupo.iloc[_lttb_indices(grupo["Consumo Médio (MB/s)"].to_numpy(), TREND_MAX_POINTS)]
+        for _, grupo in grupos
+    ]
+    return pd.concat(partes, ignore_index=True)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_filtered_frame})
+def _build_seed_data(df_base: pd.DataFrame) -> Tuple[Tuple[str, ...], np.ndarray]:
+    means = df_base.groupby("Bairro", observed=True, sort=False)["Consumo Atual (MB/s)"].mean()
+    means = means.sort_index()
+    return tuple(means.index), means.to_numpy()
+
+
+@st.fragment
 def render_trend(df_base: pd.DataFrame) -> None:
-    means = df_base.groupby("Bairro")["Consumo Atual (MB/s)"].mean()
-    seed_data = tuple(sorted((bairro, float(valor)) for bairro, valor in means.items()))
-    df_tendencia = build_trend_data(seed_data)
+    bairros_seed, bases = _build_seed_data(df_base)
+    df_tendencia = build_trend_data(bairros_seed, bases)
 
     if df_tendencia.empty:
         st.info("Sem dados suficientes para gerar a tendência mensal.")
         return
 
     st.subheader("Tendência de Consumo Mensal por Bairro")
+    df_plot = _downsample_trend(df_tendencia)
+    usa_webgl = len(df_plot) > TREND_MAX_POINTS
     fig_tend = px.line(
-        df_tendencia,
+        df_plot,
         x="Mês",
         y="Consumo Médio (MB/s)",
         color="Bairro",
-        line_shape="spline",
+        line_shape="linear" if usa_webgl else "spline",
         markers=True,
+        render_mode="webgl" if usa_webgl else "svg",
         color_discrete_sequence=px.colors.qualitative.Dark24,
     )
     st.plotly_chart(fig_tend, use_container_width=True)
 
 
+@st.fragment
 def render_map(df_filtrado: pd.DataFrame) -> None:
     if df_filtrado.empty:
         st.info("Sem dados para exibir no mapa.")
         return
 
+    grupos = df_filtrado.groupby("Bairro", sort=False, observed=True)
     mapa_bairro = (
-        df_filtrado.groupby("Bairro").agg(
-            Lat=("Lat", "first"),
-            Lon=("Lon", "first"),
-            Clientes=("ClienteID", "count"),
-            Consumo=("Consumo Atual (MB/s)", "mean"),
-            Criticos=("Excedeu", "sum"),
-        )
-    ).reset_index()
+        grupos["Consumo Atual (MB/s)"]
+        .agg(["count", "mean"])
+        .rename(columns={"count": "Clientes", "mean": "Consumo"})
+    )
+    mapa_bairro["Criticos"] = grupos["Excedeu"].sum()
+    mapa_bairro = mapa_bairro.reset_index()
+    mapa_bairro["Lat"] = mapa_bairro["Bairro"].map(_LAT).astype(float)
+    mapa_bairro["Lon"] = mapa_bairro["Bairro"].map(_LON).astype(float)
     mapa_bairro = mapa_bairro.dropna(subset=["Lat", "Lon"])
 
     if mapa_bairro.empty:
@@ -381,6 +471,12 @@ def render_map(df_filtrado: pd.DataFrame) -> None:
     st.plotly_chart(fig_map, use_container_width=True)
 
 
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+@st.fragment
 def render_table(df_filtrado: pd.DataFrame) -> None:
     st.subheader("Tabela de Dados Filtrados")
     if df_filtrado.empty:
@@ -388,7 +484,7 @@ def render_table(df_filtrado: pd.DataFrame) -> None:
         return
 
     st.dataframe(df_filtrado)
-    csv = df_filtrado.to_csv(index=False).encode("utf-8")
+    csv = _to_csv_bytes(df_filtrado)
     st.download_button(
         "Exportar CSV",
         data=csv,
@@ -399,11 +495,11 @@ def render_table(df_filtrado: pd.DataFrame) -> None:
 
 def main() -> None:
     inject_styles()
-    df, data_source = load_client_data(DATA_PATH)
+    df, data_source, bairros, tipos = load_client_data(DATA_PATH)
 
     hero_placeholder = st.empty()
-    bairros_sel, tipos_sel, criticos_sel, consumo_min = render_filters(df)
-    df_filtrado = apply_filters(df, bairros_sel, tipos_sel, criticos_sel, consumo_min)
+    bairros_sel, tipos_sel, criticos_sel, consumo_min = render_filters(df, bairros, tipos)
+    df_filtrado = apply_filters(df, tuple(bairros_sel), tuple(tipos_sel), criticos_sel, consumo_min)
 
     kpis = compute_kpis(df_filtrado)
     render_hero(
@@ -419,7 +515,7 @@ def main() -> None:
     tab1, tab2, tab3, tab4 = st.tabs(["Gráficos", "Tendência", "Mapa", "Tabela"])
 
     with tab1:
-        render_charts(df_filtrado, bairros_sel or df["Bairro"].unique())
+        render_charts(df_filtrado, bairros_sel or bairros)
     with tab2:
         render_trend(df_filtrado if not df_filtrado.empty else df)
     with tab3: